@@ -0,0 +1,37 @@
+"""Hooks provided by pytest_plt."""
+
+
+def pytest_plt_stats(config, stats):
+    """
+    Called at the end of the session with statistics about plotting.
+
+    When using ``pytest-xdist``, this is only called on the controller, with
+    statistics aggregated across all workers.
+
+    Parameters
+    ----------
+    config : pytest.Config
+        The pytest config object.
+    stats : dict
+        Plotting statistics for the session, with the keys:
+
+        - ``tests``: number of tests using the ``plt`` fixture.
+        - ``real``: number of tests given the real ``matplotlib.pyplot``.
+        - ``mock``: number of tests given a mock that does no plotting.
+        - ``cache_hits``: number of tests not plotting because their saved
+          plot is up to date (with ``--plots-changed``).
+        - ``layout_cache_hits``: number of plots reusing a cached layout
+          (with ``plt_layout = constrained``).
+        - ``figures``: number of figures still open at the end of each test
+          (figures closed during a test are not counted).
+        - ``saves``: number of saved plots for each file extension.
+        - ``bytes_written``: bytes written for each file extension.
+        - ``layout_time``: histogram of the time spent on ``tight_layout``
+          (or looking up cached constrained layouts) in the test process.
+        - ``render_time``: histogram of the time spent saving plots
+          (including layout when using ``plt_render_timeout``).
+
+        Histograms are dictionaries with the ``count``, ``sum`` and ``max`` of
+        all times (in seconds), and ``buckets`` counting the times no larger
+        than each upper bound (and larger than the previous one).
+    """
@@ -1,9 +1,18 @@
 # -*- coding: utf-8 -*-
 
+import ast
 import errno
+import functools
+import gc
+import hashlib
+import json
+import multiprocessing
 import os
 import pickle
 import re
+import time
+import warnings
+from multiprocessing import shared_memory
 
 from matplotlib import use as mpl_use
 
@@ -13,6 +22,8 @@ import pytest  # noqa: E402
 # pylint: disable=ungrouped-imports
 from matplotlib import pyplot as mpl_plt  # noqa: E402
 
+from pytest_plt import hooks  # noqa: E402
+
 
 def mkdir_p(path):
     try:
@@ -24,6 +35,10 @@ def mkdir_p(path):
             raise
 
 
+def pytest_addhooks(pluginmanager):
+    pluginmanager.add_hookspecs(hooks)
+
+
 def pytest_addoption(parser):
     parser.addoption(
         "--plots",
@@ -32,6 +47,19 @@ def pytest_addoption(parser):
         const=True,
         help="Save plots (can optionally specify a directory for plots).",
     )
+    parser.addoption(
+        "--plots-changed",
+        action="store_true",
+        default=False,
+        help="Only save plots for tests whose source file changed since their "
+        "plots were last saved (implies --plots).",
+    )
+    parser.addoption(
+        "--plots-stats",
+        metavar="PATH",
+        default=None,
+        help="Write plotting statistics for the session to a JSON file.",
+    )
 
     parser.addini(
         "plt_filename_drop",
@@ -41,6 +69,92 @@ def pytest_addoption(parser):
     parser.addini(
         "plt_dirname", default="plots", help="Default directory in which to save plots."
     )
+    parser.addini(
+        "plt_default_ext",
+        default="pdf",
+        help="Default file extension (and therefore format) for saved plots.",
+    )
+    parser.addini(
+        "plt_savefig_kwargs",
+        default="",
+        help="List of 'key = value' keyword arguments passed to savefig. "
+        "Prefix with 'ext:' to only apply to one file extension.",
+    )
+    parser.addini(
+        "plt_layout",
+        default="tight",
+        help="How plots are laid out: 'tight' (tight_layout before saving) or "
+        "'constrained' (constrained layout, with cached results).",
+    )
+    parser.addini(
+        "plt_render_timeout",
+        default="",
+        help="Maximum number of seconds to spend rendering a plot before falling "
+        "back to saving a pickle file.",
+    )
+    parser.addini(
+        "plt_render_transport",
+        default="pickle",
+        help="How figures are sent to the render process when using "
+        "plt_render_timeout: 'pickle' or 'shared_memory'.",
+    )
+
+
+def get_dirname(config):
+    """Get the plot directory, or ``None`` if plots are disabled."""
+    # Read dirname from command line, which takes precedence over .ini config
+    dirname = config.getvalue("plots")
+    if (not isinstance(dirname, str) and dirname) or (
+        not dirname and config.getvalue("plots_changed")
+    ):
+        dirname = config.getini("plt_dirname")
+    elif not dirname:
+        dirname = None  # --plots argument not provided, so disable plots
+    return dirname
+
+
+def pytest_configure(config):
+    # Validate ini options once, rather than in every test
+    parse_render_timeout(config.getini("plt_render_timeout"))
+    check_ini_choice(config, "plt_render_transport", ("pickle", "shared_memory"))
+    check_ini_choice(config, "plt_layout", ("tight", "constrained"))
+
+    config.pluginmanager.register(
+        Stats(path=config.getvalue("plots_stats")), Stats.plugin_name
+    )
+
+    dirname = get_dirname(config)
+    if dirname is not None:
+        settings = "\n".join(config.getini(name) for name in Fingerprints.ini_names)
+        config.pluginmanager.register(
+            Fingerprints(
+                dirname,
+                changed_only=config.getvalue("plots_changed"),
+                settings=settings,
+            ),
+            Fingerprints.plugin_name,
+        )
+
+
+# Attributes that the ``plt`` fixture adds to the teardown report of a test
+report_attrs_key = pytest.StashKey[dict]()
+# Whether the setup and call phases of a test passed
+passed_key = pytest.StashKey[bool]()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if call.when in ("setup", "call"):
+        item.stash[passed_key] = item.stash.get(passed_key, True) and report.passed
+    elif call.when == "teardown":
+        report_attrs = item.stash.get(report_attrs_key, {})
+        if "plt_fingerprint" in report_attrs and not item.stash.get(passed_key, True):
+            # Plots of failed tests may be incomplete, so must be saved again
+            report_attrs["plt_fingerprint"] = None
+        for name, value in report_attrs.items():
+            setattr(report, name, value)
 
 
 @pytest.hookimpl(hookwrapper=True)
@@ -95,6 +209,467 @@ class PltMock(Mock):
     multi_functions = {"subplots": 2}
 
 
+@functools.lru_cache(maxsize=None)
+def parse_savefig_kwargs(text):
+    """
+    Parse the ``plt_savefig_kwargs`` ini option.
+
+    Each non-empty line has the form ``key = value`` or ``ext: key = value``.
+    Values are parsed as Python literals where possible, and kept as strings
+    otherwise. Returns a dictionary mapping file extensions (or ``None`` for
+    options applying to all extensions) to keyword argument dictionaries.
+    """
+    savefig_kw = {}
+    for line in text.split("\n"):
+        line = line.strip()
+        if len(line) == 0:
+            continue
+
+        key, sep, value = line.partition("=")
+        if not sep:
+            raise pytest.UsageError(
+                f"Invalid plt_savefig_kwargs line '{line}'; expected 'key = value'"
+            )
+        ext, _, key = key.rpartition(":")
+        ext = ext.strip().lstrip(".") or None
+        value = value.strip()
+        try:
+            value = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            pass
+        savefig_kw.setdefault(ext, {})[key.strip()] = value
+    return savefig_kw
+
+
+@functools.lru_cache(maxsize=None)
+def parse_render_timeout(text):
+    """Parse the ``plt_render_timeout`` ini option into seconds (or ``None``)."""
+    if len(text.strip()) == 0:
+        return None
+    try:
+        render_timeout = float(text)
+    except ValueError:
+        render_timeout = -1.0
+    if not render_timeout > 0:
+        raise pytest.UsageError(
+            f"Invalid plt_render_timeout '{text}'; expected a positive number "
+            "of seconds"
+        )
+    return render_timeout
+
+
+def check_ini_choice(config, name, choices):
+    value = config.getini(name)
+    if value not in choices:
+        raise pytest.UsageError(
+            f"Invalid {name} '{value}'; expected one of "
+            + ", ".join(f"'{choice}'" for choice in choices)
+        )
+
+
+def _is_pickle(path):
+    return path.endswith(".pkl") or path.endswith(".pickle")
+
+
+# Errors raised when pickling objects that cannot be pickled
+UNPICKLABLE_ERRORS = (pickle.PicklingError, AttributeError, TypeError)
+
+# Buffers smaller than this are pickled in-band by ``dumps_shared``
+SHARED_MEMORY_MIN_BYTES = 2**16
+
+
+def dumps_shared(obj, min_bytes=SHARED_MEMORY_MIN_BYTES):
+    """
+    Pickle ``obj``, placing large buffers (e.g. NumPy arrays) in shared memory.
+
+    Uses pickle protocol 5 out-of-band buffers, so that large arrays are not
+    copied through the pickled data. Returns the pickled data and the list of
+    created ``SharedMemory`` blocks, which the caller must close and unlink
+    once the data has been loaded with ``loads_shared``.
+    """
+    blocks = []
+
+    def buffer_callback(buffer):
+        raw = buffer.raw()
+        if raw.nbytes < min_bytes:
+            return True  # pickle in-band
+
+        block = shared_memory.SharedMemory(create=True, size=max(raw.nbytes, 1))
+        block.buf[: raw.nbytes] = raw
+        blocks.append((block, raw.nbytes))
+        return False
+
+    try:
+        data = pickle.dumps(obj, protocol=5, buffer_callback=buffer_callback)
+    except BaseException:
+        close_shared(blocks)
+        raise
+    return data, blocks
+
+
+def loads_shared(data, block_specs):
+    """
+    Load data pickled with ``dumps_shared`` without copying shared buffers.
+
+    ``block_specs`` is a list of ``(name, nbytes)`` pairs for the shared memory
+    blocks. Returns the loaded object and the attached blocks, which must be
+    closed (but not unlinked) with ``close_shared`` once the object is no
+    longer used.
+    """
+    blocks = [
+        (shared_memory.SharedMemory(name=name), nbytes) for name, nbytes in block_specs
+    ]
+    obj = pickle.loads(data, buffers=[block.buf[:nbytes] for block, nbytes in blocks])
+    return obj, blocks
+
+
+def close_shared(blocks, unlink=True):
+    for block, _ in blocks:
+        try:
+            block.close()
+        except BufferError:
+            pass  # memory is still referenced; it is released on process exit
+        if unlink:
+            block.unlink()
+
+
+def _layout_and_save(fig, savefig_kw, path, layout):
+    if layout == "tight" and len(fig.get_axes()) > 0:
+        fig.tight_layout()
+    fig.savefig(path, **savefig_kw)
+
+
+def _render(ready, path, layout, obj=None, data=None, block_specs=None):
+    """
+    Lay out and save a figure; run in a separate process.
+
+    The figure and savefig keyword arguments are passed directly as ``obj`` when
+    the process is forked, and are otherwise pickled in ``data`` (with large
+    buffers in the shared memory blocks given by ``block_specs``). ``ready`` is
+    set once the figure is loaded.
+    """
+    blocks = []
+    if obj is None and block_specs is None:
+        obj = pickle.loads(data)
+    elif obj is None:
+        obj, blocks = loads_shared(data, block_specs)
+    fig, savefig_kw = obj
+    del obj
+    ready.set()
+
+    _layout_and_save(fig, savefig_kw, path, layout)
+
+    if len(blocks) > 0:
+        # Unpickled figures are registered with pyplot, and contain reference
+        # cycles, so close and collect them to release the views into shared
+        # memory before closing it
+        mpl_plt.close(fig)
+        del fig, savefig_kw
+        gc.collect()
+        close_shared(blocks, unlink=False)
+
+
+class Fingerprints:
+    """
+    Records a fingerprint of each test's source file along with its saved plot.
+
+    Fingerprints are stored in the plot directory so that, with
+    ``--plots-changed``, plots are only saved again for tests whose source file
+    (or the ini options affecting how plots are saved) has changed.
+    Fingerprints are collected from test reports so that they are also gathered
+    from ``pytest-xdist`` workers.
+    """
+
+    plugin_name = "plt_fingerprints"
+    filename = ".plt_fingerprints.json"
+    ini_names = (
+        "plt_filename_drop",
+        "plt_default_ext",
+        "plt_savefig_kwargs",
+        "plt_layout",
+    )
+
+    def __init__(self, dirname, changed_only=False, settings=""):
+        self.path = os.path.join(dirname, self.filename)
+        self.changed_only = changed_only
+        self.settings = settings.encode("utf-8")
+        self.hashes = {}
+        self.records = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as fh:
+                self.records = json.load(fh)
+
+    def fingerprint(self, path):
+        if path not in self.hashes:
+            with open(path, "rb") as fh:
+                digest = hashlib.sha256(self.settings)
+                digest.update(fh.read())
+                self.hashes[path] = digest.hexdigest()
+        return self.hashes[path]
+
+    def is_current(self, nodeid, path):
+        """Whether the saved plot for a test is up to date with its source."""
+        record = self.records.get(nodeid)
+        return (
+            record is not None
+            and record["fingerprint"] == self.fingerprint(path)
+            and (record["plot"] is None or os.path.exists(record["plot"]))
+        )
+
+    def pytest_runtest_logreport(self, report):
+        if report.when != "teardown" or not hasattr(report, "plt_fingerprint"):
+            return
+
+        if report.plt_fingerprint is None:
+            self.records.pop(report.nodeid, None)
+        else:
+            self.records[report.nodeid] = report.plt_fingerprint
+
+    def pytest_sessionfinish(self, session):
+        if hasattr(session.config, "workerinput"):
+            return  # pytest-xdist workers report to the controller
+        if len(self.records) == 0:
+            return
+
+        mkdir_p(os.path.dirname(self.path))
+        with open(self.path, "w", encoding="utf-8") as fh:
+            json.dump(self.records, fh, indent=1, sort_keys=True)
+
+
+class Stats:
+    """
+    Aggregates plotting statistics over the session.
+
+    Statistics for each test are collected from test reports so that they are
+    also gathered from ``pytest-xdist`` workers. At the end of the session, they
+    are passed to the ``pytest_plt_stats`` hook and optionally written to a
+    JSON file.
+    """
+
+    plugin_name = "plt_stats"
+    time_buckets = (0.001, 0.01, 0.1, 1.0, 10.0)
+
+    def __init__(self, path=None):
+        self.path = path
+        self.stats = {
+            "tests": 0,
+            "real": 0,
+            "mock": 0,
+            "cache_hits": 0,
+            "layout_cache_hits": 0,
+            "figures": 0,
+            "saves": {},
+            "bytes_written": {},
+            "layout_time": self.histogram(),
+            "render_time": self.histogram(),
+        }
+
+    @classmethod
+    def histogram(cls):
+        buckets = {str(bound): 0 for bound in cls.time_buckets}
+        buckets["+Inf"] = 0
+        return {"count": 0, "sum": 0.0, "max": 0.0, "buckets": buckets}
+
+    def observe(self, name, value):
+        histogram = self.stats[name]
+        histogram["count"] += 1
+        histogram["sum"] += value
+        histogram["max"] = max(histogram["max"], value)
+        bucket = next(
+            (str(bound) for bound in self.time_buckets if value <= bound), "+Inf"
+        )
+        histogram["buckets"][bucket] += 1
+
+    def add(self, test_stats):
+        """Add the statistics from a single test."""
+        self.stats["tests"] += 1
+        self.stats["real" if test_stats["real"] else "mock"] += 1
+        self.stats["cache_hits"] += int(test_stats["cache_hit"])
+        self.stats["layout_cache_hits"] += int(test_stats.get("layout_cache_hit", 0))
+        self.stats["figures"] += test_stats.get("figures", 0)
+
+        ext = test_stats.get("format")
+        if ext is not None:
+            saves, bytes_written = self.stats["saves"], self.stats["bytes_written"]
+            saves[ext] = saves.get(ext, 0) + 1
+            bytes_written[ext] = bytes_written.get(ext, 0) + test_stats["bytes"]
+
+        for name in ("layout_time", "render_time"):
+            if name in test_stats:
+                self.observe(name, test_stats[name])
+
+    def pytest_runtest_logreport(self, report):
+        test_stats = getattr(report, "plt_stats", None)
+        if report.when == "teardown" and test_stats is not None:
+            self.add(test_stats)
+
+    def pytest_sessionfinish(self, session):
+        if hasattr(session.config, "workerinput"):
+            return  # pytest-xdist workers report to the controller
+
+        session.config.hook.pytest_plt_stats(config=session.config, stats=self.stats)
+        if self.path is not None:
+            mkdir_p(os.path.dirname(os.path.abspath(self.path)))
+            with open(self.path, "w", encoding="utf-8") as fh:
+                json.dump(self.stats, fh, indent=1)
+
+
+# Maximum number of figure layouts kept by ``LayoutCache``
+LAYOUT_CACHE_SIZE = 256
+
+
+def _text_key(text):
+    return (
+        text.get_text(),
+        text.get_fontproperties(),
+        text._linespacing,
+        text.get_rotation(),
+        text.get_rotation_mode(),
+        text.get_horizontalalignment(),
+        text.get_verticalalignment(),
+        text.get_usetex(),
+        text.get_wrap(),
+        text.get_visible(),
+        text.get_in_layout(),
+    )
+
+
+def _axis_key(axis):
+    # Tick labels are computed before the offset text, which depends on them
+    ticklabels = tuple(_text_key(t) for t in axis.get_ticklabels())
+    return (
+        axis.get_visible(),
+        ticklabels,
+        axis.major.formatter.get_offset(),
+        _text_key(axis.offsetText),
+        _text_key(axis.label),
+        axis.labelpad,
+        axis.get_label_position(),
+        # Tick parameters (e.g. from ``tick_params``) change tick padding and size
+        repr(sorted(axis._major_tick_kw.items())),
+        repr(sorted(axis._minor_tick_kw.items())),
+    )
+
+
+def _axes_key(ax):
+    """Get the layout key for one axes, or ``None`` if it cannot be cached."""
+    spec = ax.get_subplotspec()
+    if spec is None or spec.get_topmost_subplotspec() is not spec:
+        return None
+
+    titles = (ax.title, ax._left_title, ax._right_title)
+    known = {ax.xaxis, ax.yaxis, ax.patch, *titles, *ax.spines.values()}
+    for child in ax.get_children():
+        # Other artists (e.g. legends, text, insets) can extend beyond the axes,
+        # so only allow artists that are not part of the layout or are clipped
+        if not (
+            child in known
+            or not child.get_in_layout()
+            or child._fully_clipped_to_axes()
+        ):
+            return None
+
+    return (
+        spec.get_gridspec().get_geometry(),
+        (spec.rowspan.start, spec.rowspan.stop),
+        (spec.colspan.start, spec.colspan.stop),
+        ax.axison,
+        ax.get_aspect(),
+        ax.get_adjustable(),
+        ax.get_box_aspect(),
+        tuple((_text_key(title), title.get_position()) for title in titles),
+        # Title padding and automatic title positioning
+        tuple(ax.titleOffsetTrans._t),
+        ax._autotitlepos,
+        tuple(
+            (name, spine.get_visible(), repr(spine.get_position()))
+            for name, spine in ax.spines.items()
+        ),
+        _axis_key(ax.xaxis),
+        _axis_key(ax.yaxis),
+    )
+
+
+# rcParams that can change the layout of a figure
+_LAYOUT_RC_PREFIXES = ("axes.", "figure.", "font.", "text.", "xtick.", "ytick.")
+
+
+def layout_key(fig):
+    """
+    Get a key identifying everything that determines a figure's layout.
+
+    Returns ``None`` if the layout of the figure cannot be cached. Only figures
+    made up of axes on a top-level grid, containing only titles, axis
+    decorations, and artists clipped to the axes are cached. Other artists
+    (e.g. colorbars, insets, legends, and free text) can have extents that are
+    not captured by the key.
+    """
+    suplabels = [
+        getattr(fig, name, None) for name in ("_suptitle", "_supxlabel", "_supylabel")
+    ]
+    known = {fig.patch, *fig.axes, *suplabels}
+    if any(child not in known for child in fig.get_children()):
+        return None
+
+    engine = fig.get_layout_engine()
+    key = [
+        tuple(fig.get_size_inches()),
+        None if engine is None else tuple(sorted(engine.get().items())),
+        repr(
+            sorted(
+                (name, value)
+                for name, value in mpl_plt.rcParams.items()
+                if name.startswith(_LAYOUT_RC_PREFIXES)
+            )
+        ),
+    ]
+    for text in suplabels:
+        key.append(None if text is None else (_text_key(text), text.get_position()))
+
+    for ax in fig.get_axes():
+        axes_key = _axes_key(ax)
+        if axes_key is None:
+            return None
+        key.append(axes_key)
+    return tuple(key)
+
+
+class LayoutCache:
+    """
+    Caches constrained layout results across tests.
+
+    Figures whose ``layout_key`` matches that of a previously saved figure
+    reuse its axes positions instead of computing the layout again.
+    """
+
+    def __init__(self, maxsize=LAYOUT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.positions = {}
+
+    def apply(self, fig, key):
+        """Apply the cached layout for ``key`` to ``fig``, if there is one."""
+        if key is None or key not in self.positions:
+            return False
+
+        fig.set_layout_engine("none")
+        for ax, bounds in zip(fig.get_axes(), self.positions[key]):
+            ax.set_position(bounds)
+        return True
+
+    def store(self, fig, key):
+        """Store the layout of ``fig``, which must have been drawn."""
+        if key is None:
+            return
+        if len(self.positions) >= self.maxsize:
+            del self.positions[next(iter(self.positions))]
+        self.positions[key] = [
+            ax.get_position(original=True).bounds for ax in fig.get_axes()
+        ]
+
+
+layout_cache = LayoutCache()
+
+
 class Recorder:
     def __init__(self, dirname, nodeid, filename_drop=None):
         self.dirname = dirname
@@ -145,42 +720,215 @@ class Recorder:
 
 
 class Plotter(Recorder):
+    # Maximum number of seconds to wait for a render process to start and load
+    # the figure, which does not count toward ``render_timeout``
+    render_startup_timeout = 60.0
+
+    def __init__(
+        self,
+        dirname,
+        nodeid,
+        filename_drop=None,
+        default_ext="pdf",
+        savefig_kw=None,
+        render_timeout=None,
+        render_transport="pickle",
+        layout="tight",
+    ):
+        super().__init__(dirname, nodeid, filename_drop=filename_drop)
+        self.default_ext = default_ext
+        self.stats = {}
+        self.savefig_kw_by_ext = {} if savefig_kw is None else savefig_kw
+        self.render_timeout = render_timeout
+        self.render_transport = render_transport
+        self.layout = layout
+
     def __enter__(self):
         if self.record:
             self.plt = mpl_plt
+            if self.layout == "constrained":
+                # Lay out figures in a single pass when they are saved
+                self._constrained_rc = mpl_plt.rcParams["figure.constrained_layout.use"]
+                mpl_plt.rcParams["figure.constrained_layout.use"] = True
         else:
             self.plt = PltMock()
-        self.plt.saveas = self.get_filename(ext="pdf")
+        self.plt.saveas = self.get_filename(ext=self.default_ext)
         return self.plt
 
     def __exit__(self, type, value, traceback):
         if self.record:
+            if self.layout == "constrained":
+                mpl_plt.rcParams["figure.constrained_layout.use"] = self._constrained_rc
+
+            self.stats["figures"] = len(self.plt.get_fignums())
             if self.plt.saveas is None:
                 del self.plt.saveas
                 self.plt.close("all")
                 return
 
-            if len(self.plt.gcf().get_axes()) > 0:
+            path = os.path.join(self.dirname, self.plt.saveas)
+            render_in_process = self.render_timeout is None or _is_pickle(path)
+            fig = self.plt.gcf()
+            key = None
+            if render_in_process and len(fig.get_axes()) > 0:
                 # tight_layout errors if no axes are present
-                self.plt.tight_layout()
-
-            self.save(os.path.join(self.dirname, self.plt.saveas))
+                # (with a render timeout, layout is done in the render process)
+                start = time.perf_counter()
+                if self.layout == "tight":
+                    self.plt.tight_layout()
+                elif not _is_pickle(path):
+                    # constrained layout is done when saving, unless cached
+                    key = layout_key(fig)
+                    self.stats["layout_cache_hit"] = layout_cache.apply(fig, key)
+                self.stats["layout_time"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            self.save(path)
+            self.stats["render_time"] = time.perf_counter() - start
+            if key is not None and not self.stats["layout_cache_hit"]:
+                layout_cache.store(fig, key)
+            if self.saved is not None:
+                self.stats["format"] = os.path.splitext(self.saved)[1].lstrip(".")
+                self.stats["bytes"] = os.path.getsize(self.saved)
             self.plt.close("all")
 
     def save(self, path):
         mkdir_p(os.path.dirname(path))
 
-        if path.endswith(".pkl") or path.endswith(".pickle"):
-            with open(path, "wb") as fh:
-                pickle.dump(self.plt.gcf(), fh)
+        if _is_pickle(path):
+            self.save_pickle(path)
+        elif self.render_timeout is not None:
+            path = self.save_with_timeout(path)
         else:
-            savefig_kw = {"bbox_inches": "tight"}
-            if hasattr(self.plt, "bbox_extra_artists"):
-                savefig_kw["bbox_extra_artists"] = self.plt.bbox_extra_artists
-            self.plt.savefig(path, **savefig_kw)
+            self.plt.savefig(path, **self.savefig_kw(path))
 
         super().save(path)
 
+    def savefig_kw(self, path):
+        ext = os.path.splitext(path)[1].lstrip(".")
+        savefig_kw = {}
+        if self.layout == "tight" or hasattr(self.plt, "bbox_extra_artists"):
+            # constrained layout already fits the figure, so only compute the
+            # tight bounding box when needed to include extra artists
+            savefig_kw["bbox_inches"] = "tight"
+        savefig_kw.update(self.savefig_kw_by_ext.get(None, {}))
+        savefig_kw.update(self.savefig_kw_by_ext.get(ext, {}))
+        if hasattr(self.plt, "bbox_extra_artists"):
+            savefig_kw["bbox_extra_artists"] = self.plt.bbox_extra_artists
+        return savefig_kw
+
+    def save_pickle(self, path):
+        with open(path, "wb") as fh:
+            pickle.dump(self.plt.gcf(), fh)
+
+    def save_with_timeout(self, path):
+        """
+        Render the current figure in a separate process.
+
+        If rendering takes longer than ``render_timeout`` seconds (or starting the
+        render process takes longer than ``render_startup_timeout`` seconds), the
+        render process is terminated and the figure is pickled instead. Returns
+        the path of the file that was written.
+        """
+        # Pass the keyword arguments with the figure so that any
+        # ``bbox_extra_artists`` still refer to artists in the unpickled figure
+        obj = (self.plt.gcf(), self.savefig_kw(path))
+        ctx = multiprocessing.get_context()
+        if ctx.get_start_method() == "fork":
+            # The forked process already has the figure, so it is not pickled
+            kwargs, blocks = {"obj": obj}, []
+        else:
+            try:
+                kwargs, blocks = self.pickle_for_render(obj)
+            except UNPICKLABLE_ERRORS as e:
+                warnings.warn(
+                    f"Could not pickle the plot for '{self.nodeid}' ({e}); "
+                    "rendering it without a render time budget."
+                )
+                _layout_and_save(*obj, path, self.layout)
+                return path
+
+        try:
+            started, timed_out, exitcode = self.run_render_process(ctx, path, kwargs)
+        finally:
+            close_shared(blocks)
+
+        if timed_out and not started:
+            return self.save_timeout_fallback(
+                path,
+                f"Starting the render process for '{self.nodeid}' exceeded "
+                f"{self.render_startup_timeout} seconds",
+            )
+        elif timed_out:
+            return self.save_timeout_fallback(
+                path,
+                f"Rendering the plot for '{self.nodeid}' exceeded the render time "
+                f"budget of {self.render_timeout} seconds",
+            )
+        elif exitcode != 0:
+            raise RuntimeError(
+                f"Rendering the plot for '{self.nodeid}' failed "
+                f"(render process exit code {exitcode})."
+            )
+        return path
+
+    def run_render_process(self, ctx, path, kwargs):
+        """
+        Run ``_render`` in a new process, terminating it if it takes too long.
+
+        Returns whether the process started (i.e. loaded the figure) in time,
+        whether it was terminated, and its exit code.
+        """
+        ready = ctx.Event()
+        proc = ctx.Process(
+            target=_render, args=(ready, path, self.layout), kwargs=kwargs
+        )
+        proc.start()
+
+        # Process startup and loading the figure do not count as rendering,
+        # but are limited separately so that a hung process cannot block
+        deadline = time.perf_counter() + self.render_startup_timeout
+        while not ready.wait(0.1) and proc.is_alive():
+            if time.perf_counter() > deadline:
+                break
+        started = ready.is_set()
+        if started:
+            proc.join(self.render_timeout)
+
+        timed_out = proc.is_alive()
+        if timed_out:
+            proc.terminate()
+            proc.join()
+        return started, timed_out, proc.exitcode
+
+    def pickle_for_render(self, obj):
+        """Get the keyword arguments to pass ``obj`` to ``_render``."""
+        if self.render_transport == "shared_memory":
+            data, blocks = dumps_shared(obj)
+            block_specs = [(block.name, nbytes) for block, nbytes in blocks]
+            return {"data": data, "block_specs": block_specs}, blocks
+        return {"data": pickle.dumps(obj)}, []
+
+    def save_timeout_fallback(self, path, reason):
+        """Pickle the figure after rendering timed out, if possible."""
+        if os.path.exists(path):
+            os.remove(path)  # remove partially written output
+        fallback = f"{os.path.splitext(path)[0]}.pkl"
+        try:
+            self.save_pickle(fallback)
+        except UNPICKLABLE_ERRORS:
+            if os.path.exists(fallback):
+                os.remove(fallback)
+            fallback = None
+
+        if fallback is None:
+            warnings.warn(
+                f"{reason}; the figure could not be pickled, so no plot was saved."
+            )
+        else:
+            warnings.warn(f"{reason}; saved '{fallback}' instead.")
+        return fallback
+
 
 @pytest.fixture
 def plt(request):
@@ -202,22 +950,54 @@ def plt(request):
     filename_drop = request.config.getini("plt_filename_drop")
     filename_drop = [s for s in filename_drop.split("\n") if len(s) > 0]
 
-    # Read plt_dirname from .ini config file
-    default_dirname = request.config.getini("plt_dirname")
-
-    # Read dirname from command line, which takes precedence over .ini config
-    dirname = request.config.getvalue("plots")
-    if not isinstance(dirname, str) and dirname:
-        dirname = default_dirname
-    elif not dirname:
-        dirname = None  # --plots argument not provided, so disable plots
+    dirname = get_dirname(request.config)
 
-    plotter = Plotter(dirname, request.node.nodeid, filename_drop=filename_drop)
+    # With --plots-changed, skip plotting if the saved plot is up to date
+    fingerprints = request.config.pluginmanager.get_plugin(Fingerprints.plugin_name)
+    source = None if fingerprints is None else str(request.node.path)
+    cache_hit = (
+        fingerprints is not None
+        and fingerprints.changed_only
+        and fingerprints.is_current(request.node.nodeid, source)
+    )
+    if cache_hit:
+        dirname = None
+
+    # Read plt_default_ext and plt_savefig_kwargs from .ini config file
+    default_ext = request.config.getini("plt_default_ext").lstrip(".")
+    savefig_kw = parse_savefig_kwargs(request.config.getini("plt_savefig_kwargs"))
+
+    # Read plt_render_timeout from .ini config file
+    render_timeout = parse_render_timeout(request.config.getini("plt_render_timeout"))
+    render_transport = request.config.getini("plt_render_transport")
+
+    # Read plt_layout from .ini config file
+    layout = request.config.getini("plt_layout")
+
+    plotter = Plotter(
+        dirname,
+        request.node.nodeid,
+        filename_drop=filename_drop,
+        default_ext=default_ext,
+        savefig_kw=savefig_kw,
+        render_timeout=render_timeout,
+        render_transport=render_transport,
+        layout=layout,
+    )
 
     def _finalize():
         plotter.__exit__(None, None, None)
         if plotter.saved is not None:
             request.node.user_properties.append(("plt_saved", plotter.saved))
+        report_attrs = request.node.stash.setdefault(report_attrs_key, {})
+        if plotter.record:
+            report_attrs["plt_fingerprint"] = {
+                "fingerprint": fingerprints.fingerprint(source),
+                "plot": plotter.saved,
+            }
+        report_attrs["plt_stats"] = dict(
+            plotter.stats, real=plotter.record, cache_hit=cache_hit
+        )
 
     request.addfinalizer(_finalize)
     return plotter.__enter__()  # pylint: disable=unnecessary-dunder-call
@@ -13,13 +13,24 @@ file will be run due to configuration in ``setup.cfg``. However, other
 test files can be run manually by passing them to ``pytest``.
 """
 
+import json
+import multiprocessing
 import os
 import pickle
+import timeit
 from pathlib import Path
 
+import numpy as np
 import pytest
 
-from pytest_plt.plugin import Mock
+from pytest_plt.plugin import (
+    Mock,
+    Plotter,
+    close_shared,
+    dumps_shared,
+    layout_cache,
+    loads_shared,
+)
 
 pytest_plugins = ["pytester"]
 
@@ -46,6 +57,190 @@ def test_mock():
     assert isinstance(mock.foo, Mock)
 
 
+def test_shared_transport():
+    small = np.arange(10.0)
+    large = np.arange(100000.0)
+    data, blocks = dumps_shared({"small": small, "large": large})
+    try:
+        # Only the large array is placed in shared memory
+        assert len(blocks) == 1
+        assert len(data) < small.nbytes + large.nbytes
+
+        specs = [(block.name, nbytes) for block, nbytes in blocks]
+        obj, attached = loads_shared(data, specs)
+        assert np.array_equal(obj["small"], small)
+        assert np.array_equal(obj["large"], large)
+        del obj
+        close_shared(attached, unlink=False)
+    finally:
+        close_shared(blocks)
+
+
+def _last_inband(data):
+    return float(pickle.loads(data)[-1])
+
+
+def _last_shared(data, specs):
+    x, blocks = loads_shared(data, specs)
+    last = float(x[-1])
+    del x
+    close_shared(blocks, unlink=False)
+    return last
+
+
+benchmark = pytest.mark.skipif(
+    "PYTEST_PLT_BENCHMARK" not in os.environ,
+    reason="Set the PYTEST_PLT_BENCHMARK environment variable to run benchmarks",
+)
+
+
+@benchmark
+def test_render_transport_benchmark():
+    """
+    Compare in-band pickling and shared memory for sending arrays to a process.
+
+    Run with ``PYTEST_PLT_BENCHMARK=1`` and ``-s`` to see the timings.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        pool.apply(_last_inband, (pickle.dumps(np.zeros(1)),))  # warm up
+
+        print("\n    size (MB)  in-band (ms)  shared (ms)")
+        for n in [2**16, 2**19, 2**22, 2**23]:
+            x = np.random.RandomState(n).uniform(size=n)
+
+            def inband(x=x):
+                assert pool.apply(_last_inband, (pickle.dumps(x, protocol=5),)) == x[-1]
+
+            def shared(x=x):
+                data, blocks = dumps_shared(x)
+                specs = [(block.name, nbytes) for block, nbytes in blocks]
+                try:
+                    assert pool.apply(_last_shared, (data, specs)) == x[-1]
+                finally:
+                    close_shared(blocks)
+
+            t_inband = min(timeit.repeat(inband, number=1, repeat=3))
+            t_shared = min(timeit.repeat(shared, number=1, repeat=3))
+            print(
+                f"    {x.nbytes / 2**20:9.1f}  {t_inband * 1e3:12.2f}  "
+                f"{t_shared * 1e3:11.2f}"
+            )
+
+
+def _plot_grid(tmpdir, n, layout, decorate=None):
+    plotter = Plotter(str(tmpdir), f"grid{n}", default_ext="png", layout=layout)
+    plt = plotter.__enter__()  # pylint: disable=unnecessary-dunder-call
+    fig, axes = plt.subplots(n, n, figsize=(2 * n, 2 * n))
+    for k, ax in enumerate(np.ravel(axes)):
+        ax.plot(np.linspace(0, k, 20), label="x")
+        ax.set_title(f"Axes {k}")
+        ax.set_xlabel("x")
+        ax.set_ylabel("y")
+        if decorate is not None:
+            decorate(ax)
+
+    start = timeit.default_timer()
+    plotter.__exit__(None, None, None)
+    elapsed = timeit.default_timer() - start
+    return elapsed, [ax.get_position().bounds for ax in fig.get_axes()], plotter
+
+
+def _fresh_layout(tmpdir, decorate=None):
+    layout_cache.positions.clear()
+    _, positions, plotter = _plot_grid(tmpdir, 2, "constrained", decorate)
+    assert not plotter.stats["layout_cache_hit"]
+    return positions
+
+
+def _cached_layout(tmpdir, base, decorate):
+    """Lay out a figure after a similar figure's layout was cached."""
+    _fresh_layout(tmpdir, base)
+    _, positions, plotter = _plot_grid(tmpdir, 2, "constrained", decorate)
+    return positions, plotter.stats["layout_cache_hit"]
+
+
+def test_layout_cache(tmpdir):
+    positions = _fresh_layout(tmpdir)
+    assert len(layout_cache.positions) == 1
+
+    _, cached_positions, plotter = _plot_grid(tmpdir, 2, "constrained")
+    assert plotter.stats["layout_cache_hit"]
+    assert np.allclose(cached_positions, positions)
+
+
+def _legend(label):
+    return lambda ax: ax.legend([label], loc="upper left", bbox_to_anchor=(1, 1))
+
+
+@pytest.mark.parametrize(
+    "base, decorate, changes_layout",
+    [
+        # Different tick labels on the same grid
+        pytest.param(
+            None,
+            lambda ax: ax.set_xticks([0, 10], ["start", "a long tick label"]),
+            True,
+            id="ticklabels",
+        ),
+        # Legends anchored outside the axes, with different contents
+        pytest.param(_legend("x"), _legend("long"), True, id="legend"),
+        pytest.param(None, lambda ax: ax.tick_params(pad=30), True, id="tick_params"),
+        pytest.param(
+            None, lambda ax: ax.set_ylim(1e6, 1e6 + 1), True, id="offset_text"
+        ),
+        pytest.param(
+            None, lambda ax: ax.set_ylabel("y", labelpad=40), True, id="labelpad"
+        ),
+        pytest.param(
+            lambda ax: ax.set_title("T"),
+            lambda ax: ax.set_title("T", pad=40),
+            True,
+            id="title_pad",
+        ),
+        # Whether fonts change the layout depends on the fonts that are installed
+        pytest.param(
+            None,
+            lambda ax: ax.set_ylabel("y", fontfamily="serif", fontweight="bold"),
+            False,
+            id="font",
+        ),
+        # Free text outside the axes
+        pytest.param(
+            None,
+            lambda ax: ax.text(1.05, 0.5, "text", transform=ax.transAxes),
+            True,
+            id="text",
+        ),
+    ],
+)
+def test_layout_cache_miss(tmpdir, base, decorate, changes_layout):
+    positions, cache_hit = _cached_layout(tmpdir, base, decorate)
+    assert not cache_hit
+    assert np.allclose(positions, _fresh_layout(tmpdir, decorate))
+    if changes_layout:
+        assert not np.allclose(positions, _fresh_layout(tmpdir, base))
+
+
+@benchmark
+def test_layout_benchmark(tmpdir):
+    """
+    Compare saving time for tight and constrained layouts of subplot grids.
+
+    Run with ``PYTEST_PLT_BENCHMARK=1`` and ``-s`` to see the timings.
+    """
+    print("\n    grid  tight (ms)  constrained (ms)  cached (ms)")
+    for n in [1, 2, 4, 6]:
+        t_tight = _plot_grid(tmpdir, n, "tight")[0]
+        layout_cache.positions.clear()
+        t_constrained = _plot_grid(tmpdir, n, "constrained")[0]
+        t_cached = _plot_grid(tmpdir, n, "constrained")[0]
+        print(
+            f"    {n}x{n}  {t_tight * 1e3:10.1f}  {t_constrained * 1e3:16.1f}  "
+            f"{t_cached * 1e3:11.1f}"
+        )
+
+
 def assert_all_passed(result):
     """
     Assert that all outcomes are 0 except for 'passed'.
@@ -256,3 +451,477 @@ def test_pickle_files(testdir):
         with pytest.raises(pickle.UnpicklingError):
             with open(str(img_file), "rb") as fh:
                 pickle.load(fh)
+
+
+def test_render_timeout(testdir):
+    copy_all_tests(testdir, "package/tests")
+    testdir.makeini("\n".join(["[pytest]", "plt_render_timeout = 60"]))
+
+    result = testdir.runpytest("-v", "--plots")
+    n_passed = assert_all_passed(result)
+
+    # All plots should be rendered in the render process
+    saved = saved_plots(result)
+    assert 0 < len(saved) <= n_passed
+    assert any(Path(plot).suffix == ".pdf" for _, plot in saved)
+    for _, plot in saved:
+        assert Path(plot).exists()
+
+
+def test_render_timeout_exceeded(testdir):
+    copy_all_tests(testdir, "package/tests")
+    testdir.makeini("\n".join(["[pytest]", "plt_render_timeout = 0.000001"]))
+
+    result = testdir.runpytest("-v", "--plots")
+    n_passed = assert_all_passed(result)
+    result.stdout.fnmatch_lines(["*exceeded the render time budget*"])
+
+    # All plots should fall back to pickle files
+    saved = saved_plots(result)
+    assert 0 < len(saved) <= n_passed
+    for _, plot in saved:
+        path = Path(plot)
+        assert path.suffix in [".pkl", ".pickle"]
+        assert path.exists()
+        assert not path.with_suffix(".pdf").exists()
+
+
+def test_savefig_kwargs(testdir):
+    testdir.makepyfile(
+        test_savefig_kwargs="""
+        def test_default_ext(plt):
+            assert plt.saveas.endswith(".png")
+            plt.plot([0, 1], [1, 0])
+
+        def test_pdf(plt):
+            plt.plot([0, 1], [1, 0])
+            plt.saveas = plt.saveas[:-4] + ".pdf"
+        """
+    )
+    testdir.makeini(
+        "\n".join(
+            [
+                "[pytest]",
+                "plt_default_ext = png",
+                "plt_savefig_kwargs =",
+                "    bbox_inches = None",
+                "    png: dpi = 20",
+                "    pdf: metadata = {'Creator': 'pytest-plt-test'}",
+            ]
+        )
+    )
+
+    result = testdir.runpytest("-v", "--plots")
+    assert assert_all_passed(result) == 2
+    saved = dict(saved_plots(result))
+    assert len(saved) == 2
+
+    # bbox_inches=None keeps the full figure size, so the size is set by dpi
+    png = Path(saved["test_savefig_kwargs.py::test_default_ext"])
+    assert png.suffix == ".png"
+    with open(str(png), "rb") as fh:
+        header = fh.read(24)
+    width = int.from_bytes(header[16:20], "big")
+    height = int.from_bytes(header[20:24], "big")
+    assert (width, height) == (128, 96)
+
+    pdf = Path(saved["test_savefig_kwargs.py::test_pdf"])
+    assert pdf.suffix == ".pdf"
+    assert b"pytest-plt-test" in pdf.read_bytes()
+
+
+def test_savefig_kwargs_invalid(testdir):
+    testdir.makepyfile(
+        test_invalid="""
+        def test_invalid(plt):
+            plt.plot([0, 1], [1, 0])
+        """
+    )
+    testdir.makeini("\n".join(["[pytest]", "plt_savefig_kwargs =", "    dpi"]))
+
+    result = testdir.runpytest("-v", "--plots")
+    result.stdout.fnmatch_lines(["*Invalid plt_savefig_kwargs line 'dpi'*"])
+
+
+def test_plots_changed(testdir):
+    copy_all_tests(testdir, "package/tests")
+    testdir.makepyfile(
+        **{
+            "package/tests/test_changed": """
+            def test_changed(plt):
+                plt.plot([0, 1], [1, 0])
+            """
+        }
+    )
+
+    # The first run saves all plots
+    result = testdir.runpytest("-v", "--plots-changed")
+    n_passed = assert_all_passed(result)
+    saved = saved_plots(result)
+    assert 0 < len(saved) <= n_passed
+    for _, plot in saved:
+        assert Path(plot).parts[0] == "plots"
+        assert Path(plot).exists()
+
+    # Nothing changed, so no plots are saved but previous plots are kept
+    result = testdir.runpytest("-v", "--plots-changed")
+    assert assert_all_passed(result) == n_passed
+    assert len(saved_plots(result)) == 0
+    for _, plot in saved:
+        assert Path(plot).exists()
+
+    # Only plots for tests in the changed file are saved
+    changed = Path(str(testdir.tmpdir), "package", "tests", "test_changed.py")
+    changed.write_text(changed.read_text() + "\n    plt.title('Changed')\n")
+    result = testdir.runpytest("-v", "--plots-changed")
+    assert assert_all_passed(result) == n_passed
+    assert [test for test, _ in saved_plots(result)] == [
+        "package/tests/test_changed.py::test_changed"
+    ]
+
+    # Without --plots-changed, all plots are saved again
+    result = testdir.runpytest("-v", "--plots")
+    assert len(saved_plots(result)) == len(saved)
+
+    # Changing how plots are saved saves all plots again
+    testdir.makeini("\n".join(["[pytest]", "plt_savefig_kwargs =", "    dpi = 50"]))
+    result = testdir.runpytest("-v", "--plots-changed")
+    assert len(saved_plots(result)) == len(saved)
+
+    # Fingerprints are not added to user properties
+    result = testdir.runpytest("-v", "--plots", "--junitxml", "junit.xml")
+    assert len(saved_plots(result)) == len(saved)
+    junit = Path(str(testdir.tmpdir), "junit.xml").read_text()
+    assert "plt_fingerprint" not in junit
+
+
+def test_plots_changed_failed(testdir):
+    testdir.makepyfile(
+        test_failing="""
+        import os
+
+        def test_failing(plt):
+            plt.plot([0, 1], [1, 0])
+            assert not os.path.exists("fail")
+            plt.title("Complete")
+        """
+    )
+    fail = Path(str(testdir.tmpdir), "fail")
+    fail.touch()
+
+    # Plots of failed tests are saved, but saved again in the next run
+    for _ in range(2):
+        result = testdir.runpytest("-v", "--plots-changed")
+        result.assert_outcomes(failed=1)
+        assert len(saved_plots(result)) == 1
+
+    # Once the test passes, its plot is up to date
+    fail.unlink()
+    result = testdir.runpytest("-v", "--plots-changed")
+    result.assert_outcomes(passed=1)
+    assert len(saved_plots(result)) == 1
+    result = testdir.runpytest("-v", "--plots-changed")
+    result.assert_outcomes(passed=1)
+    assert len(saved_plots(result)) == 0
+
+
+@pytest.mark.parametrize("args", [(), ("--plots",), ("--plots-changed",)])
+def test_doctest(testdir, args):
+    testdir.maketxtfile(
+        test_doc="""
+        >>> plt = getfixture("plt")
+        >>> _ = plt.plot([0, 1], [1, 0])
+        """
+    )
+    result = testdir.runpytest("-v", "--doctest-glob=*.txt", *args)
+    assert assert_all_passed(result) == 1
+    assert len(saved_plots(result)) == (1 if args else 0)
+
+
+@pytest.mark.parametrize("transport", ["pickle", "shared_memory"])
+def test_render_transport(testdir, transport):
+    testdir.makepyfile(
+        test_transport="""
+        import numpy as np
+
+        def test_large_line(plt):
+            x = np.linspace(0, 1, 100000)
+            plt.plot(x, np.sin(x))
+            plt.saveas = plt.saveas[:-4] + ".png"
+        """
+    )
+    testdir.makeini(
+        "\n".join(
+            [
+                "[pytest]",
+                "plt_render_timeout = 60",
+                f"plt_render_transport = {transport}",
+            ]
+        )
+    )
+    # Figures are only sent to render processes that are not forked
+    use_spawn(testdir)
+
+    # Do not capture output, so that output of the render process is in stderr
+    result = testdir.runpytest_subprocess("-v", "-s", "--plots", "-W", "error")
+    assert assert_all_passed(result) == 1
+    assert "Exception ignored" not in result.stderr.str()
+    assert "BufferError" not in result.stderr.str()
+    saved = saved_plots(result)
+    assert len(saved) == 1
+    assert Path(saved[0][1]).suffix == ".png"
+    assert Path(saved[0][1]).exists()
+
+
+def test_plots_stats(testdir):
+    testdir.makepyfile(
+        test_stats="""
+        def test_pdf(plt):
+            plt.figure()
+            plt.plot([0, 1], [1, 0])
+            plt.figure()
+            plt.plot([0, 1], [0, 1])
+
+        def test_png(plt):
+            plt.plot([0, 1], [1, 0])
+            plt.saveas = plt.saveas[:-4] + ".png"
+
+        def test_no_save(plt):
+            plt.saveas = None
+
+        def test_closed(plt):
+            plt.figure()
+            plt.close(plt.figure())
+            plt.saveas = None
+        """
+    )
+    testdir.makeconftest(
+        """
+        def pytest_plt_stats(config, stats):
+            print(f"\\nplt stats: {stats['tests']} tests, {stats['figures']} figures")
+        """
+    )
+
+    result = testdir.runpytest("-s", "--plots", "--plots-stats", "stats/plt.json")
+    assert assert_all_passed(result) == 4
+    # Closed figures are not counted
+    result.stdout.fnmatch_lines(["plt stats: 4 tests, 4 figures"])
+
+    with open(str(Path(str(testdir.tmpdir), "stats", "plt.json"))) as fh:
+        stats = json.load(fh)
+    assert stats["real"] == 4
+    assert stats["mock"] == 0
+    assert stats["saves"] == {"pdf": 1, "png": 1}
+    for ext, n_bytes in stats["bytes_written"].items():
+        assert n_bytes == sum(
+            p.stat().st_size
+            for p in Path(str(testdir.tmpdir), "plots").glob(f"*.{ext}")
+        )
+    assert stats["layout_time"]["count"] == 2
+    assert stats["render_time"]["count"] == 2
+    assert sum(stats["render_time"]["buckets"].values()) == 2
+
+    # Without --plots, all tests get the mock
+    result = testdir.runpytest(
+        "-s", "--plots-stats", "plt.json", "--junitxml", "junit.xml"
+    )
+    result.stdout.fnmatch_lines(["plt stats: 4 tests, 0 figures"])
+    with open(str(Path(str(testdir.tmpdir), "plt.json"))) as fh:
+        stats = json.load(fh)
+    assert stats["mock"] == 4
+    assert stats["saves"] == {}
+
+    # Statistics are not added to user properties
+    junit = Path(str(testdir.tmpdir), "junit.xml").read_text()
+    assert "plt_stats" not in junit
+
+
+def test_constrained_layout(testdir):
+    copy_all_tests(testdir, "package/tests")
+    testdir.makeini("\n".join(["[pytest]", "plt_layout = constrained"]))
+
+    result = testdir.runpytest("-v", "--plots")
+    n_passed = assert_all_passed(result)
+
+    saved = saved_plots(result)
+    assert 0 < len(saved) <= n_passed
+    for _, plot in saved:
+        assert Path(plot).exists()
+
+
+def use_start_method(testdir, method, conftest=""):
+    """Start render processes with ``method`` (use ``runpytest_subprocess``)."""
+    if method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"The '{method}' start method is not available")
+    testdir.makeconftest(
+        "\n".join(
+            [
+                "import multiprocessing",
+                f"multiprocessing.set_start_method('{method}', force=True)",
+                conftest,
+            ]
+        )
+    )
+
+
+def use_spawn(testdir):
+    use_start_method(testdir, "spawn")
+
+
+UNPICKLABLE_TEST = """
+from matplotlib.ticker import FuncFormatter
+
+def test_unpicklable(plt):
+    plt.plot([0, 1], [1, 0])
+    plt.gca().xaxis.set_major_formatter(FuncFormatter(lambda x, pos: f"{x}s"))
+"""
+
+
+@pytest.mark.parametrize("method", ["fork", "spawn"])
+def test_render_timeout_unpicklable(testdir, method):
+    testdir.makepyfile(test_unpicklable=UNPICKLABLE_TEST)
+    testdir.makeini("\n".join(["[pytest]", "plt_render_timeout = 60"]))
+    use_start_method(testdir, method)
+    result = testdir.runpytest_subprocess("-v", "--plots")
+    if method == "spawn":
+        # The figure cannot be sent to the render process, so it is rendered here
+        result.stdout.fnmatch_lines(["*Could not pickle the plot*"])
+    else:
+        # Forked render processes do not need to pickle the figure
+        assert "Could not pickle" not in result.stdout.str()
+
+    assert assert_all_passed(result) == 1
+    saved = saved_plots(result)
+    assert len(saved) == 1
+    assert Path(saved[0][1]).suffix == ".pdf"
+    assert Path(saved[0][1]).exists()
+
+
+def test_render_timeout_exceeded_unpicklable(testdir):
+    testdir.makepyfile(test_unpicklable=UNPICKLABLE_TEST)
+    testdir.makeini("\n".join(["[pytest]", "plt_render_timeout = 0.000001"]))
+    # Only forked render processes can render figures that cannot be pickled
+    use_start_method(testdir, "fork")
+
+    result = testdir.runpytest_subprocess("-v", "--plots")
+    assert assert_all_passed(result) == 1
+    result.stdout.fnmatch_lines(["*could not be pickled, so no plot was saved*"])
+    assert len(saved_plots(result)) == 0
+    plots = Path(str(testdir.tmpdir), "plots").iterdir()
+    assert [p for p in plots if not p.name.startswith(".")] == []
+
+
+def test_render_timeout_excludes_startup(testdir):
+    """Starting the render process and loading the figure take longer than the budget."""
+    testdir.makepyfile(
+        slowload="""
+        import time
+
+        class SlowLoad:
+            def __init__(self):
+                self.delay = 2
+
+            def __setstate__(self, state):
+                time.sleep(state["delay"])
+                self.__dict__.update(state)
+        """,
+        test_startup="""
+        from slowload import SlowLoad
+
+        def test_slow_load(plt):
+            plt.plot([0, 1], [1, 0])
+            plt.gcf().slow_load = SlowLoad()
+        """,
+    )
+    testdir.makeini("\n".join(["[pytest]", "plt_render_timeout = 1"]))
+    use_spawn(testdir)
+
+    result = testdir.runpytest_subprocess("-v", "--plots")
+    assert assert_all_passed(result) == 1
+    assert "exceeded the render time budget" not in result.stdout.str()
+    saved = saved_plots(result)
+    assert len(saved) == 1
+    assert Path(saved[0][1]).suffix == ".pdf"
+
+
+def test_render_startup_timeout(testdir):
+    """Starting the render process takes longer than the startup limit."""
+    testdir.makepyfile(
+        slowload="""
+        import time
+
+        class SlowLoad:
+            def __init__(self):
+                self.delay = 60
+
+            def __setstate__(self, state):
+                time.sleep(state["delay"])
+                self.__dict__.update(state)
+        """,
+        test_startup="""
+        from slowload import SlowLoad
+
+        def test_slow_load(plt):
+            plt.plot([0, 1], [1, 0])
+            plt.gcf().slow_load = SlowLoad()
+        """,
+    )
+    testdir.makeini("\n".join(["[pytest]", "plt_render_timeout = 30"]))
+    use_start_method(
+        testdir,
+        "spawn",
+        conftest="from pytest_plt.plugin import Plotter\n"
+        "Plotter.render_startup_timeout = 1",
+    )
+
+    result = testdir.runpytest_subprocess("-v", "--plots")
+    assert assert_all_passed(result) == 1
+    result.stdout.fnmatch_lines(
+        ["*Starting the render process for *test_slow_load* exceeded 1 seconds*"]
+    )
+    saved = saved_plots(result)
+    assert len(saved) == 1
+    assert Path(saved[0][1]).suffix == ".pkl"
+    assert Path(saved[0][1]).exists()
+
+
+def test_render_timeout_invalid(testdir):
+    testdir.makepyfile(
+        test_invalid="""
+        def test_invalid(plt):
+            pass
+        """
+    )
+    testdir.makeini("\n".join(["[pytest]", "plt_render_timeout = 1s"]))
+
+    result = testdir.runpytest("-v", "--plots")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*Invalid plt_render_timeout '1s'*"])
+
+
+def test_render_transport_invalid(testdir):
+    testdir.makepyfile(
+        test_invalid="""
+        def test_invalid(plt):
+            pass
+        """
+    )
+    testdir.makeini("\n".join(["[pytest]", "plt_render_transport = pipe"]))
+
+    result = testdir.runpytest("-v")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*Invalid plt_render_transport 'pipe'*"])
+
+
+def test_layout_invalid(testdir):
+    testdir.makepyfile(
+        test_invalid="""
+        def test_invalid(plt):
+            pass
+        """
+    )
+    testdir.makeini("\n".join(["[pytest]", "plt_layout = compressed"]))
+
+    result = testdir.runpytest("-v")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*Invalid plt_layout 'compressed'*"])